@@ -1,7 +1,9 @@
 import nltk
 import pandas as pd
 from utils.preprocessing import remove_noise_from_df, normalize_df
+from utils.ingestion import IngestionMetrics, ingest_raw_pages
 from clustering.wiki_graph import WikiGraph
+from clustering.wiki_writer import write_clusters
 
 
 class ClusteringPipeline(object):
@@ -10,12 +12,22 @@ class ClusteringPipeline(object):
         self.wiki_pages = []
         self.wiki_graph = WikiGraph()
         self.wiki_clusters = None
+        self.ingestion_metrics = None
     
     def load_raw_data(self):
         self.wiki_df = pd.read_pickle(
             "data/dataset_business_technology_cybersecurity.pickle")
         self.wiki_df = pd.DataFrame(self.wiki_df)
     
+    def ingest_raw_data(self, source, batch_size=64, max_concurrency=32, n_workers=None):
+        # reads the raw articles concurrently and preprocesses them by batches as they arrive
+        self.ingestion_metrics = IngestionMetrics()
+        self.wiki_pages = ingest_raw_pages(
+            source, batch_size=batch_size, max_concurrency=max_concurrency,
+            n_workers=n_workers, metrics=self.ingestion_metrics)
+        self.wiki_df = pd.DataFrame(self.wiki_pages)
+        return self.ingestion_metrics
+
     def preprocessing(self):
         self.wiki_df["content"] = remove_noise_from_df(self.wiki_df["content"])
         self.wiki_df["content"] = normalize_df(self.wiki_df["content"])
@@ -32,4 +44,8 @@ class ClusteringPipeline(object):
         self.wiki_clusters = self.wiki_graph.get_wiki_clusters()
         return self.wiki_clusters
 
-        
+    def export_results(self, path, edges_path=None, output_format=None, chunk_size=10000):
+        if self.wiki_clusters is None:
+            raise RuntimeError("No clusters to export, the clustering should be run first")
+        return write_clusters(self.wiki_clusters, path, edges_path=edges_path,
+                              output_format=output_format, chunk_size=chunk_size)
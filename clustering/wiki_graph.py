@@ -128,8 +128,9 @@ class WikiGraph(object):
             return self.wiki_nodes[id]
         
         self.num_wiki_nodes += 1
+        # the node keeps the own id of the page when it has one (e.g. ingested pages), its position otherwise
         new_wiki_node = WikiNode(
-            id=id, title=wiki_page["title"], content=wiki_page["content"], topic=wiki_page["topic"])
+            id=wiki_page.get("id", id), title=wiki_page["title"], content=wiki_page["content"], topic=wiki_page["topic"])
         self.wiki_nodes[id] = new_wiki_node
         
         return new_wiki_node
@@ -0,0 +1,134 @@
+import csv
+import json
+import os
+from itertools import islice
+
+# -=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=
+
+# =======================================================================================================================
+#                                           CLUSTERING RESULTS EXPORT
+# This file includes the utility functions used to export the clustering results to disk so that downstream jobs
+# can load them without re-running the pipeline. Records are generated lazily and written by chunks, hence the memory
+# used does not depend on the number of pages.
+# Supported formats:
+#   - jsonl: one JSON object per line.
+#   - csv: one column per field with a header line.
+# =======================================================================================================================
+
+ASSIGNMENT_FIELDS = ('page_id', 'title', 'topic', 'cluster_id', 'cluster_title', 'degree')
+EDGE_FIELDS = ('source_id', 'target_id', 'weight')
+OUTPUT_FORMATS = ('jsonl', 'csv')
+
+# =======================================================================================================================
+def iter_assignments(wiki_clusters):
+    """Generates the cluster assignment of every wiki page.
+
+    Args:
+        wiki_clusters (List[WikiCluster]): the clusters returned by the clustering.
+
+    Yields:
+        tuple: (page id, title, topic, cluster id, cluster title, degree) of a page, the page id being
+        the own id of the page when it has one.
+    """
+    for cluster_id, wiki_cluster in enumerate(wiki_clusters):
+        cluster_title = wiki_cluster.get_title()
+        for wiki_node in wiki_cluster:
+            yield (wiki_node.get_id(), wiki_node.wiki_page.title, wiki_node.get_topic(),
+                   cluster_id, cluster_title, len(wiki_node.wiki_neighbors))
+
+# =======================================================================================================================
+def iter_edges(wiki_clusters):
+    """Generates the weighted edges of the graph, each undirected edge being given once.
+
+    Args:
+        wiki_clusters (List[WikiCluster]): the clusters returned by the clustering.
+
+    Yields:
+        tuple: (source id, target id, weight) of an edge.
+    """
+    for wiki_cluster in wiki_clusters:
+        for wiki_node in wiki_cluster:
+            source_id = wiki_node.get_id()
+            for wiki_neighbor, weight in wiki_node.wiki_neighbors.items():
+                target_id = wiki_neighbor.get_id()
+                if source_id < target_id:
+                    yield (source_id, target_id, weight)
+
+# =======================================================================================================================
+def get_output_format(path, output_format=None):
+    """Returns the output format given explicitly or inferred from the file extension.
+
+    Args:
+        path (str): the path of the output file.
+        output_format (str): 'jsonl' or 'csv', None to infer it from the extension.
+
+    Returns:
+        str: the output format.
+    """
+    if output_format is None:
+        output_format = os.path.splitext(path)[1].lstrip('.').lower()
+        output_format = 'jsonl' if output_format in ('json', 'ndjson') else output_format
+    if output_format not in OUTPUT_FORMATS:
+        raise ValueError("Output format should be one of " + str(OUTPUT_FORMATS) + ": " + str(output_format))
+    return output_format
+
+# =======================================================================================================================
+def write_records(records, path, fields, output_format=None, chunk_size=10000):
+    """Streams records to a file by chunks.
+
+    Args:
+        records (iterable of tuple): the records to be written, ordered as fields.
+        path (str): the path of the output file.
+        fields (tuple of str): the names of the fields of a record.
+        output_format (str): 'jsonl' or 'csv', None to infer it from the extension.
+        chunk_size (int): the number of records written at once.
+
+    Returns:
+        int: the number of records written.
+    """
+    output_format = get_output_format(path, output_format)
+    records = iter(records)
+    nb_records = 0
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        if output_format == 'csv':
+            writer = csv.writer(f)
+            writer.writerow(fields)
+        while True:
+            chunk = list(islice(records, chunk_size))
+            if not chunk:
+                break
+            if output_format == 'csv':
+                writer.writerows(chunk)
+            else:
+                f.write(''.join(json.dumps(dict(zip(fields, record))) + '\n' for record in chunk))
+            nb_records += len(chunk)
+    return nb_records
+
+# =======================================================================================================================
+def write_clusters(wiki_clusters, path, edges_path=None, output_format=None, chunk_size=10000):
+    """Exports the cluster assignments of the pages and optionally the weighted edge list.
+
+    Args:
+        wiki_clusters (List[WikiCluster]): the clusters returned by the clustering.
+        path (str): the path of the assignments file.
+        edges_path (str): the path of the edges file, None to skip the edges.
+        output_format (str): 'jsonl' or 'csv', None to infer it from the extensions.
+        chunk_size (int): the number of records written at once.
+
+    Returns:
+        tuple: the number of assignments and the number of edges written.
+    """
+    # both formats are checked before writing anything
+    get_output_format(path, output_format)
+    if edges_path:
+        get_output_format(edges_path, output_format)
+
+    nb_assignments = write_records(iter_assignments(wiki_clusters), path, ASSIGNMENT_FIELDS,
+                                   output_format=output_format, chunk_size=chunk_size)
+    nb_edges = 0
+    if edges_path:
+        nb_edges = write_records(iter_edges(wiki_clusters), edges_path, EDGE_FIELDS,
+                                 output_format=output_format, chunk_size=chunk_size)
+    return nb_assignments, nb_edges
+
+# =======================================================================================================================
@@ -1,4 +1,5 @@
 from clustering.clustering_pipeline import ClusteringPipeline
+from clustering.wiki_writer import get_output_format
 import matplotlib.pyplot as plt 
 
 if __name__ == '__main__':
@@ -8,10 +9,24 @@ if __name__ == '__main__':
     group = parser.add_mutually_exclusive_group()
     group.add_argument('--backup', action='store_true')
     group.add_argument('--experiment', action='store_true')
+    group.add_argument('--source', type=str,
+                       help='directory, listing file or listing url of raw html/json articles to ingest')
+    parser.add_argument('--output', type=str,
+                        help='file (.jsonl or .csv) where the cluster assignments are exported')
+    parser.add_argument('--edges-output', type=str,
+                        help='file (.jsonl or .csv) where the weighted edge list is exported')
 
     clust_pipeline = ClusteringPipeline()
     # Parse and print the results
     args = parser.parse_args()
+    if args.edges_output and not args.output:
+        parser.error("--edges-output requires --output")
+    for output in (args.output, args.edges_output):
+        if output:
+            try:
+                get_output_format(output)
+            except ValueError as e:
+                parser.error(str(e))
     if args.backup:
         print("Backup Mode for repeatability check!")
         print("Load Processed data...")
@@ -23,10 +38,22 @@ if __name__ == '__main__':
         clust_pipeline.load_raw_data()
         print("Launch data preprocessing...")
         clust_pipeline.preprocessing()
+
+    elif args.source:
+        print("Ingestion Mode")
+        print("Ingest and preprocess raw articles from " + args.source + "...")
+        metrics = clust_pipeline.ingest_raw_data(args.source)
+        print(metrics)
         
     print("Launch Graph Creation and Clustering...")
     clusters = clust_pipeline.clustering(constraint=27)
 
+    if args.output:
+        print("Export results...")
+        nb_assignments, nb_edges = clust_pipeline.export_results(
+            args.output, edges_path=args.edges_output)
+        print("Exported " + str(nb_assignments) + " assignments and " + str(nb_edges) + " edges")
+
     print("Plot results...")
     fig, axs = plt.subplots(2, 2, figsize=(10, 10))
     for i, c in enumerate(clusters):
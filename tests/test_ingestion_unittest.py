@@ -0,0 +1,149 @@
+import unittest
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from functools import partial
+from http.server import ThreadingHTTPServer, SimpleHTTPRequestHandler
+dir_path = os.path.dirname(os.path.realpath(__file__))
+parent_dir_path = os.path.abspath(os.path.join(dir_path, os.pardir))
+sys.path.insert(0, parent_dir_path)
+
+from utils.ingestion import IngestionMetrics, ingest_raw_pages, list_raw_sources, parse_raw_page
+from clustering.wiki_graph import WikiGraph
+
+
+def tokenize_pages(wiki_pages):
+    """Lightweight preprocessing used in place of the nltk pipeline."""
+    return [dict(wiki_page, content=wiki_page["content"].split()) for wiki_page in wiki_pages]
+
+
+def slow_tokenize_pages(wiki_pages):
+    """Preprocessing slower than reading."""
+    time.sleep(0.05)
+    return tokenize_pages(wiki_pages)
+
+
+class QuietHTTPRequestHandler(SimpleHTTPRequestHandler):
+    """Http handler serving files without logging the requests."""
+
+    def log_message(self, format, *args):
+        pass
+
+
+class IngestionTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        for topic in ['business', 'technology']:
+            os.makedirs(os.path.join(self.tmp_dir.name, topic))
+        for i in range(5):
+            with open(os.path.join(self.tmp_dir.name, 'business', 'page_%d.json' % i), 'w') as f:
+                json.dump({"title": 't%d' % i, "content": 'c1 c2 c%d' % i}, f)
+        with open(os.path.join(self.tmp_dir.name, 'technology', 'page.html'), 'w') as f:
+            f.write('<html><title> Some Title </title>c1 c3</html>')
+        with open(os.path.join(self.tmp_dir.name, 'technology', 'notes.txt'), 'w') as f:
+            f.write('not an article')
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_list_raw_sources(self):
+        """Test that only html and json files are listed."""
+        locations = list_raw_sources(self.tmp_dir.name)
+        self.assertEqual(len(locations), 6, "Num of articles should be 6")
+        self.assertEqual(locations, sorted(locations))
+
+    def test_parse_raw_page(self):
+        """Test that the title and topic are retrieved from an html article."""
+        location = os.path.join(self.tmp_dir.name, 'technology', 'page.html')
+        page = parse_raw_page(location, b'<html><title> Some Title </title>c1</html>', 3)
+        self.assertEqual(page["id"], 3)
+        self.assertEqual(page["title"], 'Some Title')
+        self.assertEqual(page["topic"], 'technology')
+
+    def test_parse_raw_page_unknown_topic(self):
+        """Test that an article whose topic is not one of the dataset is rejected with its location."""
+        for location in ['/tmp/arts/page.json', 'http://localhost:8000/page.json']:
+            with self.assertRaisesRegex(ValueError, location):
+                parse_raw_page(location, b'{"content": "c1"}', 0)
+        page = parse_raw_page('http://localhost:8000/business/page.json', b'{"content": "c1"}', 0)
+        self.assertEqual(page["topic"], 'business')
+
+    def test_skip_malformed_articles(self):
+        """Test that malformed articles are skipped and counted."""
+        with open(os.path.join(self.tmp_dir.name, 'business', 'no_content.json'), 'w') as f:
+            json.dump({"title": 't'}, f)
+        with open(os.path.join(self.tmp_dir.name, 'business', 'invalid.json'), 'w') as f:
+            f.write('{"content": ')
+        with open(os.path.join(self.tmp_dir.name, 'no_topic.json'), 'w') as f:
+            json.dump({"content": 'c1'}, f)
+        malformed_pages = [{"content": 'c1', "topic": 5},
+                           {"content": 'c1', "topic": ['business']},
+                           {"content": None}]
+        for i, page in enumerate(malformed_pages):
+            with open(os.path.join(self.tmp_dir.name, 'business', 'malformed_%d.json' % i), 'w') as f:
+                json.dump(page, f)
+        metrics = IngestionMetrics()
+        wiki_pages = ingest_raw_pages(self.tmp_dir.name, batch_size=2, max_concurrency=3,
+                                      n_workers=1, preprocess=tokenize_pages, metrics=metrics)
+        self.assertEqual(len(wiki_pages), 6, "Num of pages should be 6")
+        self.assertEqual(metrics.nb_errors, 6, "Num of errors should be 6")
+        self.assertEqual([p["id"] for p in wiki_pages], list(range(6)), "Ids should not have gaps")
+        self.assertEqual([p["title"] for p in wiki_pages], ['t0', 't1', 't2', 't3', 't4', 'Some Title'])
+
+    def test_ingest_raw_pages(self):
+        """Test that all the articles are ingested, preprocessed and ordered by id."""
+        metrics = IngestionMetrics()
+        wiki_pages = ingest_raw_pages(self.tmp_dir.name, batch_size=2, max_concurrency=3,
+                                      n_workers=2, preprocess=tokenize_pages, metrics=metrics)
+        self.assertEqual([p["id"] for p in wiki_pages], list(range(6)))
+        self.assertEqual(wiki_pages[0]["content"], ['c1', 'c2', 'c0'])
+        self.assertEqual(wiki_pages[0]["topic"], 'business')
+        self.assertEqual(metrics.nb_pages, 6, "Num of pages should be 6")
+        self.assertEqual(metrics.nb_batches, 3, "Num of batches should be 3")
+
+    def test_cluster_ingested_pages(self):
+        """Test that the ingested pages can be clustered."""
+        wiki_pages = ingest_raw_pages(self.tmp_dir.name, n_workers=1, preprocess=tokenize_pages)
+        g = WikiGraph()
+        g.build_graph(wiki_pages, constraint=1)
+        wiki_clusters = g.get_wiki_clusters()
+        self.assertEqual(sum(len(c.wiki_nodes) for c in wiki_clusters), 6, "Num of pages should be 6")
+        self.assertEqual(wiki_clusters[0].get_title(), 'business')
+
+    def test_backlog_is_bounded(self):
+        """Test that a slow preprocessing holds the readers back."""
+        for i in range(40):
+            with open(os.path.join(self.tmp_dir.name, 'technology', 'extra_%d.json' % i), 'w') as f:
+                json.dump({"content": 'c1'}, f)
+        metrics = IngestionMetrics()
+        wiki_pages = ingest_raw_pages(self.tmp_dir.name, batch_size=2, max_concurrency=4, n_workers=1,
+                                      max_pending_batches=1, preprocess=slow_tokenize_pages, metrics=metrics)
+        self.assertEqual(len(wiki_pages), 46, "Num of pages should be 46")
+        # queue (batch_size) + batch being built (batch_size) + pending batches (max_pending_batches * batch_size)
+        self.assertGreater(metrics.max_queue_depth, 0)
+        self.assertLessEqual(metrics.max_queue_depth, 6)
+
+    def test_ingest_from_http_listing(self):
+        """Test that the articles listed in the index of an http server are ingested."""
+        with open(os.path.join(self.tmp_dir.name, 'index.txt'), 'w') as f:
+            f.write('business/page_0.json\ntechnology/page.html\nmissing/page.json\n')
+        handler = partial(QuietHTTPRequestHandler, directory=self.tmp_dir.name)
+        server = ThreadingHTTPServer(('localhost', 0), handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        try:
+            metrics = IngestionMetrics()
+            url = 'http://localhost:%d/index.txt' % server.server_address[1]
+            wiki_pages = ingest_raw_pages(url, n_workers=1, preprocess=tokenize_pages, metrics=metrics)
+        finally:
+            server.shutdown()
+            server.server_close()
+        self.assertEqual([p["title"] for p in wiki_pages], ['t0', 'Some Title'])
+        self.assertEqual(metrics.nb_errors, 1, "Num of errors should be 1")
+
+
+if __name__ == '__main__':
+    unittest.main()
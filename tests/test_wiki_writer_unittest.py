@@ -0,0 +1,85 @@
+import unittest
+import csv
+import json
+import os
+import sys
+import tempfile
+dir_path = os.path.dirname(os.path.realpath(__file__))
+parent_dir_path = os.path.abspath(os.path.join(dir_path, os.pardir))
+sys.path.insert(0, parent_dir_path)
+
+from clustering.wiki_graph import WikiGraph
+from clustering.wiki_writer import write_clusters, iter_edges
+
+
+class WikiWriterTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        pages = [{"title": 't1', "content": ['c1', 'c2', 'c3'], "topic": 'business'},
+                 {"title": 't2', "content": ['c1', 'c2', 'd3'], "topic": 'business'},
+                 {"title": 't3', "content": ['mo', 'l3'], "topic": 'technology'}]
+        g = WikiGraph()
+        g.build_graph(pages, constraint=2)
+        self.wiki_clusters = g.get_wiki_clusters()
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_write_assignments_jsonl(self):
+        """Test that every page assignment is written as a json line."""
+        path = os.path.join(self.tmp_dir.name, 'assignments.jsonl')
+        nb_assignments, nb_edges = write_clusters(self.wiki_clusters, path, chunk_size=2)
+        with open(path) as f:
+            records = [json.loads(line) for line in f]
+        self.assertEqual((nb_assignments, nb_edges), (3, 0))
+        self.assertEqual(len(records), 3, "Num of assignments should be 3")
+        record = [r for r in records if r["page_id"] == 2][0]
+        self.assertEqual(record["title"], 't3')
+        self.assertEqual(record["cluster_title"], 'technology')
+        self.assertEqual(record["degree"], 0)
+
+    def test_write_edges_csv(self):
+        """Test that each undirected edge is written once with its weight."""
+        path = os.path.join(self.tmp_dir.name, 'assignments.csv')
+        edges_path = os.path.join(self.tmp_dir.name, 'edges.csv')
+        write_clusters(self.wiki_clusters, path, edges_path=edges_path)
+        with open(edges_path) as f:
+            rows = list(csv.DictReader(f))
+        self.assertEqual(rows, [{"source_id": '0', "target_id": '1', "weight": '2'}])
+        self.assertEqual(len(list(iter_edges(self.wiki_clusters))), 1)
+
+    def test_unknown_format(self):
+        """Test that an unknown output format is rejected."""
+        path = os.path.join(self.tmp_dir.name, 'assignments.parquet')
+        with self.assertRaises(ValueError):
+            write_clusters(self.wiki_clusters, path)
+
+    def test_unknown_edges_format(self):
+        """Test that nothing is written when the format of the edges file is unknown."""
+        path = os.path.join(self.tmp_dir.name, 'assignments.jsonl')
+        edges_path = os.path.join(self.tmp_dir.name, 'edges.txt')
+        with self.assertRaises(ValueError):
+            write_clusters(self.wiki_clusters, path, edges_path=edges_path)
+        self.assertFalse(os.path.exists(path))
+
+    def test_export_own_page_ids(self):
+        """Test that the pages are exported with their own ids, even when they are not contiguous."""
+        pages = [{"id": 10, "title": 't1', "content": ['c1', 'c2'], "topic": 'business'},
+                 {"id": 25, "title": 't2', "content": ['c1', 'c2'], "topic": 'business'},
+                 {"id": 7, "title": 't3', "content": ['mo'], "topic": 'technology'}]
+        g = WikiGraph()
+        g.build_graph(pages, constraint=2)
+        path = os.path.join(self.tmp_dir.name, 'assignments.jsonl')
+        edges_path = os.path.join(self.tmp_dir.name, 'edges.jsonl')
+        write_clusters(g.get_wiki_clusters(), path, edges_path=edges_path)
+        with open(path) as f:
+            page_ids = {json.loads(line)["title"]: json.loads(line)["page_id"] for line in f}
+        with open(edges_path) as f:
+            edges = [json.loads(line) for line in f]
+        self.assertEqual(page_ids, {'t1': 10, 't2': 25, 't3': 7})
+        self.assertEqual(edges, [{"source_id": 10, "target_id": 25, "weight": 2}])
+
+
+if __name__ == '__main__':
+    unittest.main()
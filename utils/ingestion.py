@@ -0,0 +1,369 @@
+import asyncio
+import http.client
+import json
+import logging
+import os
+import re
+import time
+import urllib.parse
+import urllib.request
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from clustering.wiki_graph import topics
+from utils.preprocessing import preprocess_pages
+
+# =======================================================================================================================
+#                                           RAW DATA INGESTION
+# This file includes the utility functions used to ingest raw wikipedia articles stored as many individual HTML or
+# JSON files (in a directory or behind a local HTTP server) instead of a single pickle.
+# Ingestion is done with asyncio in 3 stages that overlap:
+#   - Readers: a fixed number of tasks reading and parsing the raw files.
+#   - Batcher: groups the pages read into batches.
+#   - Workers: preprocess each batch in a process pool as soon as it is complete.
+# Every stage is bounded, so that a slow preprocessing holds the readers back instead of piling pages in memory.
+# =======================================================================================================================
+
+logger = logging.getLogger(__name__)
+
+RAW_PAGE_EXTENSIONS = ('.html', '.htm', '.json')
+TOPIC_NAMES = frozenset(t.name for t in topics)
+
+# =======================================================================================================================
+
+
+class IngestionMetrics(object):
+    """
+    A class used to gather the metrics of an ingestion run
+
+    ...
+
+    Attributes
+    ----------
+    nb_pages : int
+        The number of pages read so far.
+    nb_bytes : int
+        The number of bytes read so far.
+    nb_errors : int
+        The number of articles skipped because they could not be read or parsed.
+    nb_batches : int
+        The number of batches handed to the preprocessing workers.
+    queue_depth : int
+        The current number of pages read but not preprocessed yet (queued, being batched or in a pending batch).
+    max_queue_depth : int
+        The maximum number of pages observed waiting to be preprocessed.
+
+    Methods
+    -------
+    elapsed()
+        Returns the time in seconds since the start of the ingestion.
+    pages_per_second()
+        Returns the ingestion throughput in pages per second.
+    bytes_per_second()
+        Returns the ingestion throughput in bytes per second.
+    """
+
+    def __init__(self):
+        self.nb_pages = 0
+        self.nb_bytes = 0
+        self.nb_errors = 0
+        self.nb_batches = 0
+        self.queue_depth = 0
+        self.max_queue_depth = 0
+        self.start_time = time.perf_counter()
+        self.end_time = None
+
+    def __str__(self):
+        return "Ingested " + str(self.nb_pages) + " pages in " + str(self.nb_batches) + " batches (" + \
+            "%.1f pages/s, %.1f kB/s, max queue depth: %d, errors: %d)" % (
+                self.pages_per_second(), self.bytes_per_second() / 1024, self.max_queue_depth, self.nb_errors)
+
+    def record_page(self, nb_bytes):
+        self.nb_pages += 1
+        self.nb_bytes += nb_bytes
+
+    def record_queue_depth(self, queue_depth):
+        self.queue_depth = queue_depth
+        self.max_queue_depth = max(self.max_queue_depth, queue_depth)
+
+    def stop(self):
+        self.end_time = time.perf_counter()
+
+    def elapsed(self):
+        end_time = self.end_time if self.end_time is not None else time.perf_counter()
+        return end_time - self.start_time
+
+    def pages_per_second(self):
+        elapsed = self.elapsed()
+        return self.nb_pages / elapsed if elapsed > 0 else 0.0
+
+    def bytes_per_second(self):
+        elapsed = self.elapsed()
+        return self.nb_bytes / elapsed if elapsed > 0 else 0.0
+
+# =======================================================================================================================
+#                                               SOURCES
+# =======================================================================================================================
+def is_url(location):
+    """Checks whether a location is an http(s) url or a local path.
+
+    Args:
+        location (str): the location of a raw article.
+
+    Returns:
+        bool: True if the location is an url.
+    """
+    return location.startswith(('http://', 'https://'))
+
+# =======================================================================================================================
+def read_raw_source(location, timeout=30):
+    """Reads the raw bytes of an article from the disk or over http (blocking).
+
+    Args:
+        location (str): a file path or an http(s) url.
+        timeout (int): the timeout in seconds of an http request.
+
+    Returns:
+        bytes: the raw content of the article.
+    """
+    if is_url(location):
+        with urllib.request.urlopen(location, timeout=timeout) as response:
+            return response.read()
+    with open(location, 'rb') as f:
+        return f.read()
+
+# =======================================================================================================================
+def list_raw_sources(source):
+    """Lists the raw article files of a source.
+    A directory is walked recursively and its HTML and JSON files are returned in a sorted order
+    so that the pages, hence their ids, are in the same order from one run to another.
+    A listing (a local file or an http(s) url, e.g. the index of a local HTTP server) holds one article
+    location per line; relative locations are resolved against the listing itself.
+
+    Args:
+        source (str or List[str]): a directory path, a listing path or url, or a list of file paths and/or urls.
+
+    Returns:
+        List[str]: the locations of the raw articles.
+    """
+    if not isinstance(source, str):
+        return list(source)
+
+    if os.path.isdir(source):
+        locations = []
+        for root, _, files in os.walk(source):
+            for file_name in files:
+                if file_name.lower().endswith(RAW_PAGE_EXTENSIONS):
+                    locations.append(os.path.join(root, file_name))
+        return sorted(locations)
+
+    if not is_url(source) and not os.path.isfile(source):
+        raise ValueError("Source should be a directory, a listing file or an http(s) url: " + source)
+
+    locations = []
+    for line in read_raw_source(source).decode('utf-8').splitlines():
+        line = line.strip()
+        if not line or line.startswith('#'):
+            continue
+        if is_url(source):
+            locations.append(urllib.parse.urljoin(source, line))
+        elif is_url(line):
+            locations.append(line)
+        else:
+            locations.append(os.path.join(os.path.dirname(source), line))
+    return locations
+
+# =======================================================================================================================
+def parse_raw_page(location, raw, id):
+    """Parses a raw article into a wiki page record (id, title, content, topic).
+    JSON articles are expected to hold at least a "content" field, and may define "title" and "topic".
+    For HTML articles the title is taken from the <title> tag and the content is the whole markup,
+    which is cleaned later by the preprocessing.
+    When the topic is not given, it is the name of the folder containing the article. In both cases
+    it must be one of the topics of the dataset, otherwise the clusters could not be titled.
+
+    Args:
+        location (str): the file path or url of the article.
+        raw (bytes): the raw content of the article.
+        id (int): the position of the article among the locations, used to order the pages.
+
+    Raises:
+        ValueError: if the article is malformed or its topic is unknown.
+
+    Returns:
+        dict: the wiki page record.
+    """
+    text = raw.decode('utf-8', 'ignore')
+    path = urllib.parse.urlparse(location).path if is_url(location) else location
+    path = path.rstrip('/')
+    stem, extension = os.path.splitext(os.path.basename(path))
+    topic = os.path.basename(os.path.dirname(path))
+
+    if extension.lower() == '.json':
+        try:
+            page = json.loads(text)
+        except ValueError as e:
+            raise ValueError(location + ": invalid json (" + str(e) + ")")
+        if not isinstance(page, dict) or "content" not in page:
+            raise ValueError(location + ": json article without a \"content\" field")
+        title = page.get("title", stem)
+        content = page["content"]
+        topic = page.get("topic", topic)
+    else:
+        match = re.search(r'<title[^>]*>(.*?)</title>', text, re.IGNORECASE | re.DOTALL)
+        title = match.group(1).strip() if match else stem
+        content = text
+
+    for field, value in (("title", title), ("content", content), ("topic", topic)):
+        if not isinstance(value, str):
+            raise ValueError(location + ": the %s should be a string, got %r" % (field, value))
+    if topic not in TOPIC_NAMES:
+        raise ValueError(location + ": unknown topic %r, should be one of %s" % (topic, sorted(TOPIC_NAMES)))
+    return {"id": id, "title": title, "content": content, "topic": topic}
+
+# =======================================================================================================================
+def load_raw_page(location, id):
+    """Reads and parses an article (blocking), meant to be run in the I/O executor.
+
+    Args:
+        location (str): the file path or url of the article.
+        id (int): the id given to the page.
+
+    Returns:
+        tuple: the wiki page record and the number of bytes read.
+    """
+    raw = read_raw_source(location)
+    return parse_raw_page(location, raw, id), len(raw)
+
+# -=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=
+
+# =======================================================================================================================
+#                                           CONCURRENT INGESTION
+# =======================================================================================================================
+async def _read_pages(locations, queue, io_pool, max_concurrency, metrics):
+    """Reads the articles with max_concurrency reader tasks sharing an iterator of locations.
+    A reader only takes a new location once its page is in the queue, hence a full queue holds the readers back.
+    Articles that cannot be read or parsed are logged, counted and skipped.
+    """
+    loop = asyncio.get_running_loop()
+    pending_locations = enumerate(locations)
+
+    async def reader():
+        for id, location in pending_locations:
+            try:
+                page, nb_bytes = await loop.run_in_executor(io_pool, load_raw_page, location, id)
+            except (OSError, ValueError, http.client.HTTPException) as e:
+                metrics.nb_errors += 1
+                logger.warning("Skipping article %s: %s", location, e)
+                continue
+            metrics.record_page(nb_bytes)
+            await queue.put(page)
+
+    await asyncio.gather(*[reader() for _ in range(max_concurrency)])
+
+# =======================================================================================================================
+async def _batch_pages(queue, batch_size, max_pending_batches, cpu_pool, preprocess, metrics):
+    """Groups the pages of the queue into batches and submits every batch to the preprocessing workers.
+    At most max_pending_batches batches are in the process pool at once: when the limit is reached, the batcher
+    waits for one of them to complete before taking more pages from the queue.
+    """
+    loop = asyncio.get_running_loop()
+    pending = {}
+    batches = []
+    batch = []
+
+    def record_queue_depth():
+        metrics.record_queue_depth(queue.qsize() + len(batch) + sum(pending.values()))
+
+    async def wait_pending(return_when):
+        done, _ = await asyncio.wait(pending, return_when=return_when)
+        for future in done:
+            del pending[future]
+            batches.append(future.result())
+        record_queue_depth()
+
+    async def submit(batch):
+        if len(pending) >= max_pending_batches:
+            await wait_pending(asyncio.FIRST_COMPLETED)
+        pending[loop.run_in_executor(cpu_pool, preprocess, batch)] = len(batch)
+        metrics.nb_batches += 1
+
+    while True:
+        page = await queue.get()
+        if page is None:
+            break
+        batch.append(page)
+        record_queue_depth()
+        if len(batch) == batch_size:
+            await submit(batch)
+            batch = []
+    if batch:
+        await submit(batch)
+        batch = []
+    if pending:
+        await wait_pending(asyncio.ALL_COMPLETED)
+    return batches
+
+# =======================================================================================================================
+async def ingest_raw_pages_async(source, batch_size=64, max_concurrency=32, n_workers=None,
+                                 max_pending_batches=None, preprocess=preprocess_pages, metrics=None):
+    """Ingests raw articles concurrently and preprocesses them by batches as they arrive.
+
+    Args:
+        source (str or List[str]): a directory path, a listing path or url, or a list of file paths and/or urls.
+        batch_size (int): the number of pages handed at once to a preprocessing worker.
+        max_concurrency (int): the number of reader tasks, i.e. the maximum number of articles read at the same time.
+        n_workers (int): the number of preprocessing processes (defaults to the number of cpus).
+        max_pending_batches (int): the maximum number of batches in the process pool (defaults to twice n_workers).
+        preprocess (callable): a picklable function taking and returning a list of wiki page records.
+        metrics (IngestionMetrics): the metrics to be updated during the ingestion.
+
+    Returns:
+        List[dict]: the preprocessed wiki pages, numbered from 0 in the order of their locations.
+    """
+    metrics = metrics if metrics is not None else IngestionMetrics()
+    n_workers = n_workers or os.cpu_count() or 1
+    max_pending_batches = max_pending_batches or 2 * n_workers
+    locations = list_raw_sources(source)
+    queue = asyncio.Queue(maxsize=batch_size)
+
+    with ThreadPoolExecutor(max_workers=max_concurrency) as io_pool, \
+            ProcessPoolExecutor(max_workers=n_workers) as cpu_pool:
+        batcher = asyncio.ensure_future(
+            _batch_pages(queue, batch_size, max_pending_batches, cpu_pool, preprocess, metrics))
+        readers = asyncio.ensure_future(_read_pages(locations, queue, io_pool, max_concurrency, metrics))
+        try:
+            # the batcher only completes before the readers if it failed, which would leave them blocked on a full queue
+            await asyncio.wait([readers, batcher], return_when=asyncio.FIRST_COMPLETED)
+            if batcher.done():
+                batcher.result()
+            await readers
+            await queue.put(None)
+            batches = await batcher
+        finally:
+            for task in (readers, batcher):
+                if not task.done():
+                    task.cancel()
+    metrics.stop()
+
+    # the pages are numbered in the order of their locations once the skipped articles are left out,
+    # so that the ids match the positions of the pages used by the graph
+    wiki_pages = sorted((page for batch in batches for page in batch), key=lambda page: page["id"])
+    for id, wiki_page in enumerate(wiki_pages):
+        wiki_page["id"] = id
+    return wiki_pages
+
+# =======================================================================================================================
+def ingest_raw_pages(source, batch_size=64, max_concurrency=32, n_workers=None,
+                     max_pending_batches=None, preprocess=preprocess_pages, metrics=None):
+    """Synchronous entry point of ingest_raw_pages_async.
+
+    Args:
+        See ingest_raw_pages_async.
+
+    Returns:
+        List[dict]: the preprocessed wiki pages, numbered from 0 in the order of their locations.
+    """
+    return asyncio.run(ingest_raw_pages_async(source, batch_size=batch_size, max_concurrency=max_concurrency,
+                                              n_workers=n_workers, max_pending_batches=max_pending_batches,
+                                              preprocess=preprocess, metrics=metrics))
+# -=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=
@@ -233,3 +233,32 @@ def normalize_df(df):
     return df.progress_apply(normalize_text)
 # -=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=
 
+# =======================================================================================================================
+#                                           TOKENISATION & SEGMENTATION
+# =======================================================================================================================
+def preprocess_text(text):
+    """Full preprocessing pipeline of an html text: noise removal, normalization and tokenisation.
+
+    Args:
+        text (str): an html markup string.
+
+    Returns:
+        List[str]: the tokens of the standardized text.
+    """
+    text = remove_noise(text)
+    text = normalize_text(text)
+    return word_tokenize(text)
+
+# =======================================================================================================================
+def preprocess_pages(wiki_pages):
+    """Preprocesses the content of a batch of wiki pages.
+    Used by the preprocessing workers of the ingestion, hence it works on plain records rather than a dataframe.
+
+    Args:
+        wiki_pages (List[dict]): wiki page records with an html content.
+
+    Returns:
+        List[dict]: the wiki page records with a tokenized content.
+    """
+    return [dict(wiki_page, content=preprocess_text(wiki_page["content"])) for wiki_page in wiki_pages]
+# -=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=